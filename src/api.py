@@ -2,7 +2,9 @@ import fastapi
 from fastapi.responses import RedirectResponse
 
 from pydantic import BaseModel, Field
+from typing import List, Optional
 
+from src import arxiv_downloader
 from src.ingest_pdf import stream_graph_updates as ingest_pdf
 from src.rag_qa import stream_qa_updates as answer_question
 
@@ -14,6 +16,16 @@ class Response(BaseModel):
     response: str = Field(description="The response to the query")
 
 
+class Paper(BaseModel):
+    id: str = Field(description="The arXiv ID of the paper")
+    title: str = Field(description="The title of the paper")
+    authors: List[str] = Field(description="The authors of the paper")
+    summary: str = Field(description="The abstract of the paper")
+    published: str = Field(description="The publication date (ISO format)")
+    url: str = Field(description="The arXiv page of the paper")
+    pdf_url: str = Field(description="The PDF URL of the paper")
+
+
 app = fastapi.FastAPI()
 
 
@@ -23,10 +35,25 @@ def read_root():
 
 
 @app.post("/ingest")
-def ingest(query: Query):
-    ingest_pdf(query.query)
+def ingest(query: Query, x_profile: Optional[bool] = fastapi.Header(None)):
+    # An "X-Profile" header overrides RAG_PROFILE for this request
+    ingest_pdf(query.query, profile=x_profile)
 
 
 @app.post("/answer/")
-def answer(query: Query) -> Response:
-    return Response(response=answer_question(query.query))
+def answer(query: Query, x_profile: Optional[bool] = fastapi.Header(None)) -> Response:
+    return Response(response=answer_question(query.query, profile=x_profile))
+
+
+@app.get("/papers/search")
+def search_papers(query: str, max_results: int = 10) -> List[Paper]:
+    papers = arxiv_downloader.search_arxiv(query, max_results)
+    return [Paper(**arxiv_downloader.paper_metadata(p)) for p in papers]
+
+
+@app.get("/papers/{arxiv_id:path}")
+def get_paper(arxiv_id: str) -> Paper:
+    metadata = arxiv_downloader.get_paper_metadata(arxiv_id)
+    if metadata is None:
+        raise fastapi.HTTPException(status_code=404, detail="Paper not found")
+    return Paper(**metadata)
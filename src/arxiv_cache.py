@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class ArxivCache:
+    """Persistent SQLite cache of arXiv search results and paper metadata.
+
+    Query results are stored as lists of paper IDs, and paper metadata is stored
+    once per ID, so overlapping queries share entries. Entries older than their
+    TTL are treated as missing and deleted on the next write; a TTL of 0 disables
+    the corresponding cache.
+    """
+
+    def __init__(self, path: str, query_ttl: float = 86400, paper_ttl: float = 2592000):
+        """
+        Args:
+            path (str): Path of the SQLite file.
+            query_ttl (float, optional): Lifetime of query results in seconds.
+                Defaults to one day.
+            paper_ttl (float, optional): Lifetime of paper metadata in seconds.
+                Defaults to 30 days.
+        """
+        self.path = path
+        self.query_ttl = query_ttl
+        self.paper_ttl = paper_ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS queries (
+                    key TEXT PRIMARY KEY,
+                    ids TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS papers (
+                    arxiv_id TEXT PRIMARY KEY,
+                    metadata TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                );
+                """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One connection per operation, so the cache can be shared across threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_query(self, key: str) -> Optional[List[str]]:
+        """Return the paper IDs cached for a query, or None if missing or expired."""
+        if not self.query_ttl:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT ids FROM queries WHERE key = ? AND fetched_at > ?",
+                (key, time.time() - self.query_ttl),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_query(self, key: str, ids: List[str]):
+        """Store the paper IDs returned by a query."""
+        if not self.query_ttl:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM queries WHERE fetched_at <= ?", (now - self.query_ttl,)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO queries (key, ids, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(ids), now),
+            )
+
+    def get_papers(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the cached, non-expired metadata for the given paper IDs."""
+        if not self.paper_ttl or not ids:
+            return {}
+        placeholders = ", ".join("?" for _ in ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT arxiv_id, metadata FROM papers "
+                f"WHERE arxiv_id IN ({placeholders}) AND fetched_at > ?",
+                (*ids, time.time() - self.paper_ttl),
+            ).fetchall()
+        return {arxiv_id: json.loads(metadata) for arxiv_id, metadata in rows}
+
+    def put_papers(
+        self, papers: Dict[str, Dict[str, Any]], ttl: Optional[float] = None
+    ):
+        """Store paper metadata, keyed by paper ID.
+
+        Args:
+            papers (Dict[str, Dict[str, Any]]): Metadata by paper ID.
+            ttl (Optional[float], optional): Shorter lifetime for these entries in
+                seconds, e.g. for IDs without version whose latest version can
+                change. Defaults to paper_ttl.
+        """
+        if not self.paper_ttl or not papers:
+            return
+        now = time.time()
+        # Entries expire paper_ttl after fetched_at, so backdate short-lived ones
+        fetched_at = now
+        if ttl is not None and ttl < self.paper_ttl:
+            fetched_at = now - self.paper_ttl + ttl
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM papers WHERE fetched_at <= ?", (now - self.paper_ttl,)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO papers (arxiv_id, metadata, fetched_at) "
+                "VALUES (?, ?, ?)",
+                [
+                    (arxiv_id, json.dumps(metadata), fetched_at)
+                    for arxiv_id, metadata in papers.items()
+                ],
+            )
@@ -1,12 +1,191 @@
+import json
 import os
+import urllib.request
 import arxiv
 
 from arxiv import Result
-from typing import List, Any, Dict
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterator, List, Any, Dict, Optional
+from urllib.parse import urlparse
+
+from src.arxiv_cache import ArxivCache
+from src.pdf_store import PdfStore
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
 
+@lru_cache(maxsize=1)
+def get_cache() -> ArxivCache:
+    """Return the arXiv metadata cache, configured through environment variables.
+
+    Environment variables:
+        ARXIV_CACHE_PATH: SQLite file. Defaults to DATA_DIR/arxiv_cache.sqlite.
+        ARXIV_QUERY_CACHE_TTL: Lifetime of search results in seconds, 0 to disable.
+            Defaults to one day.
+        ARXIV_PAPER_CACHE_TTL: Lifetime of paper metadata in seconds, 0 to disable.
+            Defaults to 30 days.
+
+    Returns:
+        ArxivCache: The shared cache instance.
+    """
+    return ArxivCache(
+        os.getenv("ARXIV_CACHE_PATH", os.path.join(DATA_DIR, "arxiv_cache.sqlite")),
+        query_ttl=float(os.getenv("ARXIV_QUERY_CACHE_TTL", "86400")),
+        paper_ttl=float(os.getenv("ARXIV_PAPER_CACHE_TTL", "2592000")),
+    )
+
+
+def keep_pdfs_on_disk() -> bool:
+    """Whether downloaded PDFs are kept in DATA_DIR (PDF_STORAGE=disk, the default)
+    or only held in memory until their text is extracted (PDF_STORAGE=memory)."""
+    return os.getenv("PDF_STORAGE", "disk").lower() != "memory"
+
+
+@lru_cache(maxsize=1)
+def get_pdf_store() -> PdfStore:
+    """Return the PDF store in DATA_DIR, configured through environment variables.
+
+    Environment variables:
+        PDF_STORE_MAX_MB: Size limit of the store in MB, 0 for no limit (default).
+        PDF_STORE_COMPRESS: "true" to keep PDFs gzip-compressed. Defaults to "false".
+
+    Returns:
+        PdfStore: The shared store instance.
+    """
+    return PdfStore(
+        DATA_DIR,
+        max_bytes=int(float(os.getenv("PDF_STORE_MAX_MB", "0")) * 1024 * 1024),
+        compress=os.getenv("PDF_STORE_COMPRESS", "false").lower() == "true",
+    )
+
+
+@lru_cache(maxsize=1)
+def get_client() -> arxiv.Client:
+    """Return the arXiv API client shared by all searches.
+
+    Reusing one client keeps its rate limiting consistent across calls.
+
+    Environment variables:
+        ARXIV_PAGE_SIZE: Results requested per API call. Defaults to 100.
+        ARXIV_DELAY_SECONDS: Minimum delay between API calls. Defaults to 3,
+            the rate arXiv asks clients to respect.
+        ARXIV_NUM_RETRIES: Retries of a failed API call. Defaults to 5.
+        ARXIV_API_URL: Another server implementing the arXiv query API, such as
+            a local stand-in for tests.
+
+    Returns:
+        arxiv.Client: The shared client.
+    """
+    client = arxiv.Client(
+        page_size=int(os.getenv("ARXIV_PAGE_SIZE", "100")),
+        delay_seconds=float(os.getenv("ARXIV_DELAY_SECONDS", "3")),
+        num_retries=int(os.getenv("ARXIV_NUM_RETRIES", "5")),
+    )
+    api_url = os.getenv("ARXIV_API_URL")
+    if api_url:
+        client.query_url_format = api_url.rstrip("?") + "?{}"
+    return client
+
+
+def iter_arxiv(
+    query: str = "",
+    id_list: Optional[List[str]] = None,
+    max_results: Optional[int] = None,
+    sort_by: arxiv.SortCriterion = arxiv.SortCriterion.SubmittedDate,
+) -> Iterator[Result]:
+    """Iterate over arXiv results without loading them all in memory.
+
+    Args:
+        query (str, optional): The search string. Defaults to "".
+        id_list (Optional[List[str]], optional): Restrict results to these arXiv IDs.
+        max_results (Optional[int], optional): Maximum number of results, None for all.
+        sort_by (arxiv.SortCriterion, optional): Sort criterion. Defaults to SubmittedDate.
+
+    Yields:
+        Result: arXiv results, fetched page by page.
+    """
+    search = arxiv.Search(
+        query=query, id_list=id_list or [], max_results=max_results, sort_by=sort_by
+    )
+    yield from get_client().results(search)
+
+
+def build_query(
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> str:
+    """Build an arXiv query string for a category and/or submission date range.
+
+    Args:
+        category (Optional[str], optional): arXiv category, e.g. "cs.CL".
+        date_from (Optional[date], optional): First submission date (inclusive).
+        date_to (Optional[date], optional): Last submission date (inclusive).
+
+    Returns:
+        str: Query string for the arXiv API.
+    """
+    terms = []
+    if category:
+        terms.append(f"cat:{category}")
+    if date_from or date_to:
+        start = date_from.strftime("%Y%m%d") + "0000" if date_from else "*"
+        end = date_to.strftime("%Y%m%d") + "2359" if date_to else "*"
+        terms.append(f"submittedDate:[{start} TO {end}]")
+    if not terms:
+        raise ValueError("At least a category or a date must be given")
+    return " AND ".join(terms)
+
+
+def paper_metadata(paper: Result) -> Dict[str, Any]:
+    """Convert an arXiv result into a JSON-serializable metadata dictionary.
+
+    Args:
+        paper (Result): arXiv paper object.
+
+    Returns:
+        Dict[str, Any]: Paper metadata with id, title, authors, summary,
+            published (ISO date), url, pdf_url, primary_category and categories.
+    """
+    return {
+        "id": paper.get_short_id(),
+        "title": paper.title,
+        "authors": [a.name for a in paper.authors],
+        "summary": paper.summary,
+        "published": paper.published.isoformat(),
+        "url": paper.entry_id,
+        "pdf_url": paper.pdf_url,
+        "primary_category": paper.primary_category,
+        "categories": paper.categories,
+    }
+
+
+def paper_from_metadata(metadata: Dict[str, Any]) -> Result:
+    """Rebuild an arXiv result from a dictionary created by paper_metadata.
+
+    Args:
+        metadata (Dict[str, Any]): Paper metadata.
+
+    Returns:
+        Result: arXiv paper object usable with download_pdf.
+    """
+    return Result(
+        entry_id=metadata["url"],
+        published=datetime.fromisoformat(metadata["published"]),
+        title=metadata["title"],
+        authors=[Result.Author(name) for name in metadata["authors"]],
+        summary=metadata["summary"],
+        primary_category=metadata.get("primary_category", ""),
+        categories=metadata.get("categories", []),
+        links=[
+            Result.Link(
+                metadata["pdf_url"], title="pdf", content_type="application/pdf"
+            )
+        ],
+    )
+
+
 def search_arxiv(query: str, max_results: int = 10) -> List[Result]:
     """Search for papers on arXiv based on a query.
 
@@ -19,11 +198,72 @@ def search_arxiv(query: str, max_results: int = 10) -> List[Result]:
 
     Note:
         Results are ordered by relevance using arXiv's default criterion.
+        Results are served from the metadata cache while they are fresh.
     """
-    search = arxiv.Search(
-        query=query, max_results=max_results, sort_by=arxiv.SortCriterion.Relevance
+    cache = get_cache()
+    key = json.dumps(["relevance", query, max_results])
+
+    ids = cache.get_query(key)
+    if ids is not None:
+        papers = cache.get_papers(ids)
+        if len(papers) == len(ids):
+            return [paper_from_metadata(papers[i]) for i in ids]
+
+    results = list(
+        iter_arxiv(
+            query, max_results=max_results, sort_by=arxiv.SortCriterion.Relevance
+        )
     )
-    return list(search.results())
+    papers = {r.get_short_id(): paper_metadata(r) for r in results}
+    cache.put_papers(papers)
+    cache.put_query(key, list(papers))
+    return results
+
+
+def get_paper_metadata(arxiv_id: str) -> Optional[Dict[str, Any]]:
+    """Get the metadata of a paper by arXiv ID, from the cache if possible.
+
+    Args:
+        arxiv_id (str): arXiv ID, with or without version suffix.
+
+    Returns:
+        Optional[Dict[str, Any]]: Paper metadata as returned by paper_metadata,
+            or None if the paper does not exist.
+    """
+    cache = get_cache()
+    cached = cache.get_papers([arxiv_id])
+    if arxiv_id in cached:
+        return cached[arxiv_id]
+
+    result = next(iter_arxiv(id_list=[arxiv_id], max_results=1), None)
+    if result is None:
+        return None
+    metadata = paper_metadata(result)
+    cache.put_papers({metadata["id"]: metadata})
+    if arxiv_id != metadata["id"]:
+        # An ID without version points to the latest version, which can change,
+        # so it is only cached as long as a search result
+        cache.put_papers({arxiv_id: metadata}, ttl=cache.query_ttl)
+    return metadata
+
+
+def download_pdf_bytes(paper: Result) -> bytes:
+    """Download a PDF from arXiv into memory.
+
+    Args:
+        paper (Result): arXiv paper object containing metadata and PDF URL.
+
+    Returns:
+        bytes: Content of the PDF file.
+    """
+    # ARXIV_DOWNLOAD_DOMAIN allows a local stand-in for tests
+    pdf_url = (
+        urlparse(paper.pdf_url)
+        ._replace(netloc=os.getenv("ARXIV_DOWNLOAD_DOMAIN", "export.arxiv.org"))
+        .geturl()
+    )
+    with urllib.request.urlopen(pdf_url, timeout=60) as response:
+        return response.read()
 
 
 def download_pdf(paper: Result) -> str:
@@ -38,18 +278,13 @@ def download_pdf(paper: Result) -> str:
     Note:
         The file is saved in DATA_DIR with the paper ID as filename.
         The paper ID is converted to a filesystem-safe format.
+        Storage goes through get_pdf_store(), so the file may be compressed
+        (.pdf.gz) and older files may be evicted; read it with PdfStore.load.
+        A PDF that is still stored is reused instead of downloaded again.
     """
-    # Create data directory if it doesn't exist
-    os.makedirs(DATA_DIR, exist_ok=True)
-
     paper_id = paper.get_short_id().replace("/", "_")
-    # Define file path
-    pdf_path = os.path.join(DATA_DIR, f"{paper_id}.pdf")
-
-    # Download PDF
-    paper.download_pdf(dirpath=DATA_DIR, filename=f"{paper_id}.pdf")
-
-    return pdf_path
+    store = get_pdf_store()
+    return store.lookup(paper_id) or store.put(paper_id, download_pdf_bytes(paper))
 
 
 def download_by_query(query: str, max_results: int = 20) -> List[Dict[str, Any]]:
@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import typer
+from qdrant_client import models
+
+from src.vectorstore import QdrantVectorStore
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+POINTS_FILE = "points.jsonl"
+
+app = typer.Typer(help="Export and import Qdrant collections without re-embedding.")
+
+
+def _vector_file(name: str) -> str:
+    """File name of the .npy array holding one (possibly unnamed) vector."""
+    return f"vectors.{name}.npy" if name else "vectors.npy"
+
+
+def export_collection(
+    store: QdrantVectorStore,
+    collection_name: str,
+    output_dir: str,
+    chunk_size: int = 1000,
+) -> int:
+    """Export the vectors and payloads of a collection to a directory.
+
+    Vectors are written to float32 .npy files (one per named vector) that can be
+    memory-mapped, payloads and point IDs to a JSON Lines file in the same order,
+    and the collection's vector configuration to a manifest.
+
+    Args:
+        store (QdrantVectorStore): Vector store to read from.
+        collection_name (str): Name of the collection to export.
+        output_dir (str): Destination directory, created if needed.
+        chunk_size (int, optional): Number of points read per request. Defaults to 1000.
+
+    Returns:
+        int: Number of exported points.
+
+    Note:
+        Points are streamed straight into memory-mapped arrays, so memory use is
+        bounded by chunk_size regardless of the collection size.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    collection_info = store.client.get_collection(collection_name)
+    vectors_config = collection_info.config.params.vectors
+    if isinstance(vectors_config, dict):
+        params = dict(vectors_config)
+    else:
+        params = {"": vectors_config}
+
+    total = store.client.count(collection_name, exact=True).count
+    arrays = {
+        name: np.lib.format.open_memmap(
+            os.path.join(output_dir, _vector_file(name)),
+            mode="w+",
+            dtype=np.float32,
+            shape=(total, vp.size),
+        )
+        for name, vp in params.items()
+    }
+
+    exported = 0
+    offset = None
+    with open(os.path.join(output_dir, POINTS_FILE), "w", encoding="utf-8") as f:
+        while exported < total:
+            records, offset = store.client.scroll(
+                collection_name=collection_name,
+                limit=min(chunk_size, total - exported),
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            for record in records:
+                vectors = (
+                    record.vector
+                    if isinstance(record.vector, dict)
+                    else {"": record.vector}
+                )
+                for name, array in arrays.items():
+                    array[exported] = vectors[name]
+                f.write(
+                    json.dumps(
+                        {"id": record.id, "payload": record.payload}, default=str
+                    )
+                    + "\n"
+                )
+                exported += 1
+            logger.info(f"Exported {exported}/{total} points")
+            if offset is None:
+                break
+
+    for array in arrays.values():
+        array.flush()
+
+    manifest = {
+        "collection": collection_name,
+        "count": exported,
+        "vectors": {
+            name: vp.model_dump(mode="json", exclude_none=True)
+            for name, vp in params.items()
+        },
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Exported {exported} points from {collection_name} to {output_dir}")
+    return exported
+
+
+def read_export(
+    input_dir: str, chunk_size: int = 1000
+) -> Iterator[Tuple[List[Any], List[Any], List[Dict[str, Any]]]]:
+    """Read an export directory in chunks.
+
+    Args:
+        input_dir (str): Directory written by export_collection.
+        chunk_size (int, optional): Number of points per chunk. Defaults to 1000.
+
+    Yields:
+        Tuple[List[Any], List[Any], List[Dict[str, Any]]]: Point IDs, vectors
+            (plain lists, or dicts for named vectors) and payloads of each chunk.
+    """
+    with open(os.path.join(input_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    count = manifest["count"]
+    arrays = {
+        name: np.load(os.path.join(input_dir, _vector_file(name)), mmap_mode="r")
+        for name in manifest["vectors"]
+    }
+
+    with open(os.path.join(input_dir, POINTS_FILE), encoding="utf-8") as f:
+        for start in range(0, count, chunk_size):
+            end = min(start + chunk_size, count)
+            ids, payloads = [], []
+            for _ in range(start, end):
+                point = json.loads(f.readline())
+                ids.append(point["id"])
+                payloads.append(point["payload"])
+
+            named = {name: array[start:end].tolist() for name, array in arrays.items()}
+            if "" in named:
+                vectors = named[""]
+            else:
+                vectors = [
+                    {name: named[name][i] for name in named} for i in range(end - start)
+                ]
+            yield ids, vectors, payloads
+
+
+def import_collection(
+    store: QdrantVectorStore,
+    input_dir: str,
+    collection_name: Optional[str] = None,
+    chunk_size: int = 1000,
+    parallel: int = 1,
+) -> int:
+    """Bulk-import an export directory into a new collection.
+
+    Args:
+        store (QdrantVectorStore): Vector store to write to.
+        input_dir (str): Directory written by export_collection.
+        collection_name (Optional[str], optional): Target collection. Defaults to the
+            name of the exported collection.
+        chunk_size (int, optional): Number of points per upload request. Defaults to 1000.
+        parallel (int, optional): Number of parallel upload workers. Defaults to 1.
+
+    Returns:
+        int: Number of imported points.
+
+    Raises:
+        ValueError: If the target collection exists with different vectors.
+
+    Note:
+        The collection is created with the exported vector configuration and point
+        IDs are preserved, so importing twice overwrites instead of duplicating.
+        Indexing is paused during the import and rebuilt at the end.
+    """
+    with open(os.path.join(input_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    collection_name = collection_name or manifest["collection"]
+
+    vectors_config = {
+        name: models.VectorParams(**params)
+        for name, params in manifest["vectors"].items()
+    }
+    if not store.client.collection_exists(collection_name):
+        store.client.create_collection(
+            collection_name=collection_name,
+            vectors_config=vectors_config.get("", vectors_config),
+        )
+    else:
+        # Fail before pausing indexing rather than partway through the upload
+        existing = store.client.get_collection(collection_name).config.params.vectors
+        if not isinstance(existing, dict):
+            existing = {"": existing}
+        actual = {name: params.size for name, params in existing.items()}
+        expected = {name: params.size for name, params in vectors_config.items()}
+        if actual != expected:
+            raise ValueError(
+                f"Collection {collection_name} has vectors {actual}, but the "
+                f"export has {expected}. Import into a new collection instead."
+            )
+
+    imported = 0
+
+    def points() -> Iterator[models.PointStruct]:
+        nonlocal imported
+        for ids, vectors, payloads in read_export(input_dir, chunk_size):
+            for point_id, vector, payload in zip(ids, vectors, payloads):
+                yield models.PointStruct(id=point_id, vector=vector, payload=payload)
+            imported += len(ids)
+            logger.info(f"Queued {imported}/{manifest['count']} points for upload")
+
+    with store.indexing_paused(collection_name):
+        # A single upload keeps all parallel workers busy across chunks
+        store.client.upload_points(
+            collection_name=collection_name,
+            points=points(),
+            batch_size=chunk_size,
+            parallel=parallel,
+            max_retries=3,
+            wait=True,
+        )
+
+    logger.info(f"Imported {imported} points into {collection_name}")
+    return imported
+
+
+@app.command("export")
+def export_command(
+    output_dir: str = typer.Argument(help="Directory to write the export to"),
+    collection: str = typer.Option(
+        os.getenv("QDRANT_COLLECTION", "arxiv_chunks"), help="Collection to export"
+    ),
+    url: Optional[str] = typer.Option(None, help="Qdrant URL (default: QDRANT_URL)"),
+    chunk_size: int = typer.Option(1000, help="Points read per request"),
+):
+    """Export a collection's vectors and payloads."""
+    export_collection(QdrantVectorStore(url=url), collection, output_dir, chunk_size)
+
+
+@app.command("import")
+def import_command(
+    input_dir: str = typer.Argument(help="Directory written by the export command"),
+    collection: Optional[str] = typer.Option(
+        None, help="Target collection (default: the exported collection's name)"
+    ),
+    url: Optional[str] = typer.Option(None, help="Qdrant URL (default: QDRANT_URL)"),
+    chunk_size: int = typer.Option(1000, help="Points uploaded per request"),
+    parallel: int = typer.Option(1, help="Parallel upload workers"),
+):
+    """Bulk-import an export into a collection."""
+    import_collection(
+        QdrantVectorStore(url=url), input_dir, collection, chunk_size, parallel
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -1,5 +1,9 @@
+import atexit
+import math
 import os
-from typing import List
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Iterator, List
 from langchain_openai import OpenAIEmbeddings
 
 from dotenv import load_dotenv
@@ -7,6 +11,231 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+class EmbeddingProvider(ABC):
+    """Common interface for the embedding backends used by ingest and QA."""
+
+    @property
+    @abstractmethod
+    def vector_size(self) -> int:
+        """Dimension of the vectors produced by this provider."""
+
+    @abstractmethod
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings for a list of texts.
+
+        Args:
+            texts (List[str]): List of texts to create embeddings for.
+
+        Returns:
+            List[List[float]]: List of embedding vectors, in the same order as texts.
+        """
+
+    def embed_query(self, text: str) -> List[float]:
+        """Create the embedding for a single query text.
+
+        Args:
+            text (str): The query text.
+
+        Returns:
+            List[float]: The embedding vector.
+        """
+        return self.embed_documents([text])[0]
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API."""
+
+    VECTOR_SIZES = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+
+    def __init__(self, model: str = "text-embedding-3-small", batch_size: int = 200):
+        self.model = model
+        self.batch_size = batch_size
+        self.embeddings = OpenAIEmbeddings(
+            model=model,
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+        )
+        self._vector_size = self.VECTOR_SIZES.get(model)
+
+    @property
+    def vector_size(self) -> int:
+        if self._vector_size is None:
+            # Unknown model, ask the API once
+            self._vector_size = len(self.embed_query("vector size"))
+        return self._vector_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings in batches to respect API token limits.
+
+        Note:
+            If a batch fails, the texts are processed again with half the batch size.
+            The minimum batch size is 10 before raising an exception.
+        """
+        return self._embed_documents(texts, self.batch_size)
+
+    def _embed_documents(self, texts: List[str], batch_size: int) -> List[List[float]]:
+        if not texts:
+            return []
+
+        all_embeddings = []
+
+        # Process texts in batches
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i : i + batch_size]
+            try:
+                # Create embeddings for current batch
+                batch_embeddings = self.embeddings.embed_documents(batch)
+                all_embeddings.extend(batch_embeddings)
+            except Exception as e:
+                print(f"Error processing batch {i // batch_size + 1}: {str(e)}")
+                # If it fails, try processing with smaller batch
+                if batch_size > 10:
+                    print(f"Trying with smaller batch ({batch_size // 2})...")
+                    return self._embed_documents(texts, batch_size // 2)
+                else:
+                    raise e
+
+        return all_embeddings
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """Embeddings computed on CPU with a sentence-transformers model from disk.
+
+    Requires the optional ``local`` dependencies (``uv sync --extra local``).
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        backend: str = "torch",
+        batch_size: int = 64,
+        max_batch_chars: int = 32000,
+        num_workers: int = 1,
+    ):
+        """
+        Args:
+            model_path (str): Path to a sentence-transformers model directory.
+            backend (str, optional): "torch" or "onnx". Defaults to "torch".
+            batch_size (int, optional): Maximum number of texts per batch. Defaults to 64.
+            max_batch_chars (int, optional): Budget for batch size times the longest
+                text in the batch, which bounds padding work. Defaults to 32000.
+            num_workers (int, optional): Number of encoding processes. Defaults to 1.
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "The local embedding backend requires sentence-transformers. "
+                "Install it with `uv sync --extra local`."
+            ) from e
+
+        self.model = SentenceTransformer(
+            model_path, device="cpu", backend=backend, local_files_only=True
+        )
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.num_workers = num_workers
+        self._pool = None
+
+    @property
+    def vector_size(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings with length-aware batching.
+
+        Note:
+            Texts are sorted by length and grouped so that similar lengths share a
+            batch, then the results are put back in the original order. With more
+            than one worker, encoding is spread over a process pool instead.
+        """
+        if not texts:
+            return []
+
+        if self.num_workers > 1 and len(texts) > self.batch_size:
+            vectors = self.model.encode_multi_process(
+                texts,
+                self._get_pool(),
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+            )
+            return vectors.tolist()
+
+        all_embeddings: List[List[float]] = [[] for _ in texts]
+        for batch in self._dynamic_batches(texts):
+            vectors = self.model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                normalize_embeddings=True,
+            )
+            for i, vec in zip(batch, vectors):
+                all_embeddings[i] = vec.tolist()
+        return all_embeddings
+
+    def _dynamic_batches(self, texts: List[str]) -> Iterator[List[int]]:
+        """Yield batches of text indices, shortest texts first."""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batch: List[int] = []
+        for i in order:
+            # Texts are sorted, so the current one is the longest in the batch
+            padded = (len(batch) + 1) * max(len(texts[i]), 1)
+            if batch and (
+                len(batch) >= self.batch_size or padded > self.max_batch_chars
+            ):
+                yield batch
+                batch = []
+            batch.append(i)
+        if batch:
+            yield batch
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = self.model.start_multi_process_pool(["cpu"] * self.num_workers)
+            atexit.register(self.model.stop_multi_process_pool, self._pool)
+        return self._pool
+
+
+@lru_cache(maxsize=1)
+def get_embedding_provider() -> EmbeddingProvider:
+    """Return the embedding provider configured through environment variables.
+
+    Environment variables:
+        EMBEDDING_PROVIDER: "openai" (default) or "local".
+        EMBEDDING_MODEL: OpenAI model name. Defaults to "text-embedding-3-small".
+        LOCAL_EMBEDDING_MODEL_PATH: Model directory for the local provider.
+        LOCAL_EMBEDDING_BACKEND: "torch" (default) or "onnx".
+        LOCAL_EMBEDDING_WORKERS: Number of encoding processes. Defaults to 1.
+        EMBEDDING_BATCH_SIZE: Maximum number of texts per batch.
+
+    Returns:
+        EmbeddingProvider: The shared provider instance.
+    """
+    provider = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+    batch_size = os.getenv("EMBEDDING_BATCH_SIZE")
+
+    if provider == "openai":
+        return OpenAIEmbeddingProvider(
+            model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+            batch_size=int(batch_size or 200),
+        )
+    if provider == "local":
+        model_path = os.getenv("LOCAL_EMBEDDING_MODEL_PATH")
+        if not model_path:
+            raise ValueError(
+                "LOCAL_EMBEDDING_MODEL_PATH must be set when EMBEDDING_PROVIDER=local"
+            )
+        return LocalEmbeddingProvider(
+            model_path,
+            backend=os.getenv("LOCAL_EMBEDDING_BACKEND", "torch"),
+            batch_size=int(batch_size or 64),
+            num_workers=int(os.getenv("LOCAL_EMBEDDING_WORKERS", "1")),
+        )
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider}")
+
+
 def get_openai_embeddings(texts: List[str], batch_size: int = 200) -> List[List[float]]:
     """Create embeddings for a list of texts using the OpenAI model.
     Processes in batches to respect API token limits.
@@ -25,28 +254,25 @@ def get_openai_embeddings(texts: List[str], batch_size: int = 200) -> List[List[
     if not texts:
         return []
 
-    # Initialize embeddings model
-    embeddings = OpenAIEmbeddings(
-        model="text-embedding-3-small",
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-    )
+    return OpenAIEmbeddingProvider(batch_size=batch_size).embed_documents(texts)
 
-    all_embeddings = []
 
-    # Process texts in batches
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        try:
-            # Create embeddings for current batch
-            batch_embeddings = embeddings.embed_documents(batch)
-            all_embeddings.extend(batch_embeddings)
-        except Exception as e:
-            print(f"Error processing batch {i // batch_size + 1}: {str(e)}")
-            # If it fails, try processing with smaller batch
-            if batch_size > 10:
-                print(f"Trying with smaller batch ({batch_size // 2})...")
-                return get_openai_embeddings(texts, batch_size=batch_size // 2)
-            else:
-                raise e
-
-    return all_embeddings
+def truncate_embedding(vector: List[float], dim: int) -> List[float]:
+    """Shorten an embedding to its first dimensions and renormalize it.
+
+    Only meaningful for models trained with Matryoshka representation learning,
+    such as OpenAI's text-embedding-3 family, whose leading dimensions form a
+    usable embedding on their own.
+
+    Args:
+        vector (List[float]): Full embedding vector.
+        dim (int): Number of leading dimensions to keep.
+
+    Returns:
+        List[float]: The truncated vector with unit L2 norm.
+    """
+    truncated = vector[:dim]
+    norm = math.sqrt(sum(x * x for x in truncated))
+    if norm == 0:
+        return list(truncated)
+    return [x / norm for x in truncated]
@@ -0,0 +1,407 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import typer
+from arxiv import Result
+
+from src import arxiv_downloader, pdf_extractor, chunker, embedder
+from src.vectorstore import QdrantVectorStore
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+# Per-paper states, in processing order
+PENDING = "pending"
+DOWNLOADED = "downloaded"
+EXTRACTED = "extracted"
+EMBEDDED = "embedded"
+INDEXED = "indexed"
+STATES = [PENDING, DOWNLOADED, EXTRACTED, EMBEDDED, INDEXED]
+
+DEFAULT_CHECKPOINT = os.path.join(arxiv_downloader.DATA_DIR, "harvest.sqlite")
+
+# IDs per listing request; the API takes the ID list in the URL of each page
+ID_CHUNK_SIZE = 200
+
+app = typer.Typer(help="Resumable bulk ingestion of arXiv papers.")
+
+
+class HarvestCheckpoint:
+    """SQLite record of the progress of each paper in a harvest.
+
+    Intermediate results (PDF path, extracted text, chunks and embeddings) are
+    stored with the state they belong to, so an interrupted harvest resumes from
+    the last completed step of each paper. They are cleared once no longer needed.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                pdf_path TEXT,
+                markdown TEXT,
+                chunks TEXT,
+                embeddings BLOB,
+                error TEXT,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """)
+        self.conn.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+        self.conn.commit()
+
+    def add_paper(self, metadata: Dict):
+        """Register a paper as pending, unless it is already known."""
+        self.conn.execute(
+            """
+            INSERT OR IGNORE INTO papers (arxiv_id, seq, state, metadata, updated_at)
+            VALUES (?, (SELECT COUNT(*) FROM papers), ?, ?, ?)
+            """,
+            (metadata["id"], PENDING, json.dumps(metadata), _now()),
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def unfinished(self) -> List[sqlite3.Row]:
+        """Papers that are not indexed yet, in listing order."""
+        return self.conn.execute(
+            "SELECT * FROM papers WHERE state != ? ORDER BY seq", (INDEXED,)
+        ).fetchall()
+
+    def get(self, arxiv_id: str) -> sqlite3.Row:
+        return self.conn.execute(
+            "SELECT * FROM papers WHERE arxiv_id = ?", (arxiv_id,)
+        ).fetchone()
+
+    def update(self, arxiv_id: str, state: str, **fields):
+        """Move a paper to a new state, storing or clearing intermediate results."""
+        fields.update(state=state, error=None, updated_at=_now())
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        self.conn.execute(
+            f"UPDATE papers SET {assignments} WHERE arxiv_id = ?",
+            (*fields.values(), arxiv_id),
+        )
+        self.conn.commit()
+
+    def set_error(self, arxiv_id: str, error: str):
+        self.conn.execute(
+            "UPDATE papers SET error = ?, updated_at = ? WHERE arxiv_id = ?",
+            (error, _now(), arxiv_id),
+        )
+        self.conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of papers in each state, and of papers with an error."""
+        counts = {state: 0 for state in STATES}
+        for row in self.conn.execute(
+            "SELECT state, COUNT(*) AS n FROM papers GROUP BY state"
+        ):
+            counts[row["state"]] = row["n"]
+        counts["errors"] = self.conn.execute(
+            "SELECT COUNT(*) FROM papers WHERE error IS NOT NULL"
+        ).fetchone()[0]
+        return counts
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def chunk_point_id(arxiv_id: str, chunk_idx: int) -> str:
+    """Stable point ID for a chunk, so re-indexing a paper overwrites its points."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"arxiv:{arxiv_id}#{chunk_idx}"))
+
+
+def list_papers(
+    checkpoint: HarvestCheckpoint,
+    ids: Optional[List[str]] = None,
+    query: Optional[str] = None,
+    max_results: Optional[int] = None,
+):
+    """Register the papers to harvest in the checkpoint.
+
+    Listing is only done once per checkpoint: on resume, the stored list is used.
+
+    Raises:
+        ValueError: If a selection is given that differs from the one the
+            checkpoint was listed with.
+    """
+    selection = _selection(ids, query, max_results)
+    stored = checkpoint.get_meta("selection")
+    if stored is not None and (ids or query) and selection != stored:
+        raise ValueError(
+            f"The checkpoint was started with a different selection ({stored}); "
+            "resume it without arguments or use another --checkpoint"
+        )
+
+    if checkpoint.get_meta("listing_complete"):
+        logger.info("Using paper list from checkpoint")
+        return
+
+    if stored is None:
+        checkpoint.set_meta("selection", selection)
+    elif not (ids or query):
+        # Listing was interrupted, list again with the stored selection
+        stored_selection = json.loads(stored)
+        ids = stored_selection["ids"]
+        query = stored_selection["query"]
+        max_results = stored_selection["max_results"]
+
+    for n, result in enumerate(_iter_selection(ids, query, max_results), start=1):
+        checkpoint.add_paper(arxiv_downloader.paper_metadata(result))
+        if n % 100 == 0:
+            checkpoint.commit()
+            logger.info(f"Listed {n} papers")
+    checkpoint.commit()
+    checkpoint.set_meta("listing_complete", _now())
+
+
+def _iter_selection(
+    ids: Optional[List[str]], query: Optional[str], max_results: Optional[int]
+) -> Iterator[Result]:
+    """Iterate over the selected papers, listing IDs in chunks of ID_CHUNK_SIZE."""
+    if not ids:
+        yield from arxiv_downloader.iter_arxiv(query or "", max_results=max_results)
+        return
+
+    listed = 0
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        remaining = None if max_results is None else max_results - listed
+        if remaining is not None and remaining <= 0:
+            return
+        for result in arxiv_downloader.iter_arxiv(
+            query or "",
+            id_list=ids[start : start + ID_CHUNK_SIZE],
+            max_results=remaining,
+        ):
+            listed += 1
+            yield result
+
+
+def _selection(
+    ids: Optional[List[str]], query: Optional[str], max_results: Optional[int]
+) -> str:
+    """Normalized description of the papers to harvest, stored in the checkpoint."""
+    return json.dumps(
+        {"ids": sorted(set(ids or [])), "query": query, "max_results": max_results},
+        sort_keys=True,
+    )
+
+
+def process_paper(
+    checkpoint: HarvestCheckpoint,
+    arxiv_id: str,
+    store: QdrantVectorStore,
+    collection_name: str,
+) -> int:
+    """Run the remaining steps for one paper, recording each completed step.
+
+    Returns:
+        int: Number of chunks indexed for the paper.
+    """
+    paper = checkpoint.get(arxiv_id)
+    metadata = json.loads(paper["metadata"])
+    state = paper["state"]
+    num_chunks = 0
+
+    if state == PENDING and not arxiv_downloader.keep_pdfs_on_disk():
+        # Nothing to resume from between download and extraction
+        pdf_bytes = arxiv_downloader.download_pdf_bytes(
+            arxiv_downloader.paper_from_metadata(metadata)
+        )
+        markdown = pdf_extractor.extract_text_from_pdf(pdf_bytes)
+        checkpoint.update(arxiv_id, EXTRACTED, markdown=markdown)
+        paper, state = checkpoint.get(arxiv_id), EXTRACTED
+
+    if state == PENDING or (
+        state == DOWNLOADED and not os.path.exists(paper["pdf_path"])
+    ):
+        pdf_path = arxiv_downloader.download_pdf(
+            arxiv_downloader.paper_from_metadata(metadata)
+        )
+        checkpoint.update(arxiv_id, DOWNLOADED, pdf_path=pdf_path)
+        paper, state = checkpoint.get(arxiv_id), DOWNLOADED
+
+    if state == DOWNLOADED:
+        markdown = pdf_extractor.extract_text_from_pdf(
+            arxiv_downloader.get_pdf_store().load(paper["pdf_path"])
+        )
+        checkpoint.update(arxiv_id, EXTRACTED, markdown=markdown)
+        paper, state = checkpoint.get(arxiv_id), EXTRACTED
+
+    if state == EXTRACTED:
+        chunks = chunker.chunk_markdown_text(paper["markdown"])
+        embeddings = embedder.get_embedding_provider().embed_documents(chunks)
+        checkpoint.update(
+            arxiv_id,
+            EMBEDDED,
+            markdown=None,
+            chunks=json.dumps(chunks),
+            embeddings=np.asarray(embeddings, dtype=np.float32).tobytes(),
+        )
+        paper, state = checkpoint.get(arxiv_id), EMBEDDED
+
+    if state == EMBEDDED:
+        chunks = json.loads(paper["chunks"])
+        if chunks:
+            vector_size = embedder.get_embedding_provider().vector_size
+            embeddings = (
+                np.frombuffer(paper["embeddings"], dtype=np.float32)
+                .reshape(len(chunks), vector_size)
+                .tolist()
+            )
+            store.upsert_embeddings_qdrant(
+                embeddings,
+                [
+                    {
+                        "arxiv_id": arxiv_id,
+                        "chunk_idx": j,
+                        "text": c,
+                        "title": metadata["title"],
+                        "authors": metadata["authors"],
+                        "published": metadata["published"],
+                        "url": metadata["url"],
+                    }
+                    for j, c in enumerate(chunks)
+                ],
+                collection_name=collection_name,
+                vector_size=vector_size,
+                ids=[chunk_point_id(arxiv_id, j) for j in range(len(chunks))],
+            )
+        checkpoint.update(arxiv_id, INDEXED, chunks=None, embeddings=None)
+        num_chunks = len(chunks)
+
+    return num_chunks
+
+
+def run_harvest(
+    checkpoint: HarvestCheckpoint,
+    store: QdrantVectorStore,
+    collection_name: str,
+):
+    """Process every unfinished paper in the checkpoint, logging throughput.
+
+    Errors are recorded on the paper and do not stop the harvest; the paper is
+    retried from its last completed step on the next run.
+    """
+    pending = checkpoint.unfinished()
+    total = len(pending)
+    logger.info(f"{total} papers to process")
+
+    start = time.monotonic()
+    done, failed, chunks = 0, 0, 0
+    for paper in pending:
+        arxiv_id = paper["arxiv_id"]
+        try:
+            chunks += process_paper(checkpoint, arxiv_id, store, collection_name)
+            done += 1
+        except Exception as e:
+            failed += 1
+            checkpoint.set_error(arxiv_id, str(e))
+            logger.error(f"Error processing {arxiv_id}: {str(e)}")
+
+        elapsed = max(time.monotonic() - start, 1e-9)
+        logger.info(
+            f"[{done + failed}/{total}] {done} indexed, {failed} failed - "
+            f"{done / elapsed * 60:.1f} papers/min, {chunks / elapsed:.1f} chunks/s"
+        )
+
+    logger.info(f"Harvest finished: {checkpoint.counts()}")
+
+
+@app.command("run")
+def run_command(
+    ids: Optional[List[str]] = typer.Option(None, "--id", help="arXiv ID (repeatable)"),
+    ids_file: Optional[str] = typer.Option(
+        None, help="File with one arXiv ID per line"
+    ),
+    category: Optional[str] = typer.Option(None, help="arXiv category, e.g. cs.CL"),
+    date_from: Optional[datetime] = typer.Option(
+        None, formats=["%Y-%m-%d"], help="First submission date"
+    ),
+    date_to: Optional[datetime] = typer.Option(
+        None, formats=["%Y-%m-%d"], help="Last submission date"
+    ),
+    max_results: Optional[int] = typer.Option(None, help="Maximum number of papers"),
+    checkpoint_path: str = typer.Option(
+        DEFAULT_CHECKPOINT, "--checkpoint", help="SQLite checkpoint file"
+    ),
+):
+    """Harvest papers, resuming from the checkpoint if it already exists."""
+    ids = list(ids or [])
+    if ids_file:
+        with open(ids_file, encoding="utf-8") as f:
+            ids.extend(line.strip() for line in f if line.strip())
+
+    query = None
+    if category or date_from or date_to:
+        query = arxiv_downloader.build_query(category, date_from, date_to)
+    checkpoint = HarvestCheckpoint(checkpoint_path)
+    resumable = checkpoint.get_meta("selection") or checkpoint.get_meta(
+        "listing_complete"
+    )
+    if not ids and not query and not resumable:
+        raise typer.BadParameter(
+            "Give arXiv IDs, a category or a date range to start a harvest"
+        )
+
+    try:
+        list_papers(checkpoint, ids=ids, query=query, max_results=max_results)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    run_harvest(
+        checkpoint,
+        QdrantVectorStore(),
+        os.getenv("QDRANT_COLLECTION", "arxiv_chunks"),
+    )
+
+
+@app.command("status")
+def status_command(
+    checkpoint_path: str = typer.Option(
+        DEFAULT_CHECKPOINT, "--checkpoint", help="SQLite checkpoint file"
+    ),
+):
+    """Show the number of papers in each state."""
+    for state, count in HarvestCheckpoint(checkpoint_path).counts().items():
+        typer.echo(f"{state}: {count}")
+
+
+if __name__ == "__main__":
+    app()
@@ -1,7 +1,7 @@
 from langgraph.graph import StateGraph, START, END
 from typing_extensions import TypedDict
-from typing import List, Dict, Any
-from src import arxiv_downloader, pdf_extractor, chunker, embedder
+from typing import List, Dict, Any, Optional
+from src import arxiv_downloader, pdf_extractor, chunker, embedder, profiling
 from src.vectorstore import QdrantVectorStore
 import os
 import logging
@@ -25,6 +25,7 @@ class State(TypedDict):
         query (str): The search query for arXiv.
         arxiv_results (List[Any]): List of arXiv search results.
         pdf_paths (List[str]): List of paths to downloaded PDF files.
+        pdf_bytes (List[bytes]): Downloaded PDFs held in memory (PDF_STORAGE=memory).
         markdowns (List[str]): List of extracted text in markdown format.
         chunks (List[str]): List of text chunks after splitting.
         embeddings (List[list]): List of embedding vectors.
@@ -34,6 +35,7 @@ class State(TypedDict):
     query: str
     arxiv_results: List[Any]
     pdf_paths: List[str]
+    pdf_bytes: List[bytes]
     markdowns: List[str]
     chunks: List[str]
     embeddings: List[list]
@@ -61,8 +63,16 @@ def download_pdfs_node(state: State) -> State:
         state (State): Current state containing arXiv search results.
 
     Returns:
-        State: Updated state with paths to downloaded PDFs.
+        State: Updated state with paths to downloaded PDFs, or with the PDFs
+            themselves when they are only kept in memory.
     """
+    if not arxiv_downloader.keep_pdfs_on_disk():
+        pdf_bytes = [
+            arxiv_downloader.download_pdf_bytes(r) for r in state["arxiv_results"]
+        ]
+        logger.info(f"Downloaded {len(pdf_bytes)} PDFs into memory")
+        return {"pdf_bytes": pdf_bytes}
+
     pdf_paths = [arxiv_downloader.download_pdf(r) for r in state["arxiv_results"]]
     logger.info(f"Downloaded {len(pdf_paths)} PDFs")
     return {"pdf_paths": pdf_paths}
@@ -72,12 +82,25 @@ def extract_text_node(state: State) -> State:
     """Extract text from PDFs in markdown format.
 
     Args:
-        state (State): Current state containing PDF paths.
+        state (State): Current state containing PDF paths or in-memory PDFs.
 
     Returns:
         State: Updated state with extracted markdown texts.
     """
-    markdowns = [pdf_extractor.extract_text_from_pdf(p) for p in state["pdf_paths"]]
+    if "pdf_bytes" in state:
+        # In-memory mode, possibly with no PDFs at all
+        pdfs = state["pdf_bytes"]
+    else:
+        pdf_store = arxiv_downloader.get_pdf_store()
+        pdfs = []
+        for path, result in zip(state["pdf_paths"], state["arxiv_results"]):
+            try:
+                pdfs.append(pdf_store.load(path))
+            except FileNotFoundError:
+                # Evicted by the store's size limit, fetch it again
+                logger.warning(f"{path} was evicted, downloading it again")
+                pdfs.append(arxiv_downloader.download_pdf_bytes(result))
+    markdowns = [pdf_extractor.extract_text_from_pdf(p) for p in pdfs]
     logger.info(f"Extracted text from {len(markdowns)} PDFs")
     return {"markdowns": markdowns}
 
@@ -93,14 +116,19 @@ def chunking_node(state: State) -> State:
     """
     chunks, metadata = [], []
     for i, md in enumerate(state["markdowns"]):
+        paper = arxiv_downloader.paper_metadata(state["arxiv_results"][i])
         doc_chunks = chunker.chunk_markdown_text(md)
         chunks.extend(doc_chunks)
         metadata.extend(
             [
                 {
-                    "arxiv_id": state["arxiv_results"][i].get_short_id(),
+                    "arxiv_id": paper["id"],
                     "chunk_idx": j,
                     "text": c,
+                    "title": paper["title"],
+                    "authors": paper["authors"],
+                    "published": paper["published"],
+                    "url": paper["url"],
                 }
                 for j, c in enumerate(doc_chunks)
             ]
@@ -120,7 +148,7 @@ def embedding_node(state: State) -> State:
     Returns:
         State: Updated state with embedding vectors.
     """
-    embeddings = embedder.get_openai_embeddings(state["chunks"])
+    embeddings = embedder.get_embedding_provider().embed_documents(state["chunks"])
     logger.info(f"Generated {len(embeddings)} embeddings")
     return {"embeddings": embeddings}
 
@@ -135,11 +163,28 @@ def qdrant_node(state: State) -> State:
         State: Updated state with final status.
     """
     qdrant_vector_store = QdrantVectorStore()
-    qdrant_vector_store.upsert_embeddings_qdrant(
-        state["embeddings"],
-        state["metadata"],
-        collection_name=os.getenv("QDRANT_COLLECTION", "arxiv_chunks"),
-    )
+    collection_name = os.getenv("QDRANT_COLLECTION", "arxiv_chunks")
+    vector_size = embedder.get_embedding_provider().vector_size
+    if os.getenv("QDRANT_BULK_UPLOAD", "false").lower() == "true":
+        qdrant_vector_store.bulk_upload_qdrant(
+            state["embeddings"],
+            state["metadata"],
+            collection_name=collection_name,
+            vector_size=vector_size,
+            shard_number=int(os.getenv("QDRANT_SHARD_NUMBER", "1")),
+            replication_factor=int(os.getenv("QDRANT_REPLICATION_FACTOR", "1")),
+            write_consistency_factor=int(
+                os.getenv("QDRANT_WRITE_CONSISTENCY_FACTOR", "1")
+            ),
+            parallel=int(os.getenv("QDRANT_UPLOAD_PARALLEL", "4")),
+        )
+    else:
+        qdrant_vector_store.upsert_embeddings_qdrant(
+            state["embeddings"],
+            state["metadata"],
+            collection_name=collection_name,
+            vector_size=vector_size,
+        )
     logger.info("Successfully inserted embeddings into Qdrant")
     return {}
 
@@ -164,11 +209,13 @@ graph.add_edge("qdrant", END)
 rag_pipeline = graph.compile()
 
 
-def stream_graph_updates(query: str):
+def stream_graph_updates(query: str, profile: Optional[bool] = None):
     """Stream updates from the RAG pipeline execution.
 
     Args:
         query (str): The search query to process.
+        profile (Optional[bool], optional): Profile the run. Defaults to the
+            RAG_PROFILE environment variable.
 
     Note:
         This function logs real-time updates about the pipeline's progress,
@@ -178,35 +225,47 @@ def stream_graph_updates(query: str):
     state = {"query": query}
     logger.info(f"Starting pipeline with query: {query}")
 
-    for update in rag_pipeline.stream(state, stream_mode="updates"):
-        node_name = list(update.keys())[0]
-        logger.info(f"Node: {node_name}")
-
-        if node_name == "search_arxiv":
-            logger.info(
-                f"Articles found: {len(update[node_name].get('arxiv_results', []))}"
-            )
-        elif node_name == "download_pdfs":
-            logger.info(
-                f"PDFs downloaded: {len(update[node_name].get('pdf_paths', []))}"
-            )
-        elif node_name == "extract_text":
-            logger.info(
-                f"Texts extracted: {len(update[node_name].get('markdowns', []))}"
-            )
-        elif node_name == "chunking":
-            logger.info(f"Chunks generated: {len(update[node_name].get('chunks', []))}")
-        elif node_name == "embedding":
-            logger.info(
-                f"Embeddings generated: {len(update[node_name].get('embeddings', []))}"
-            )
+    with profiling.profile_run("ingest", profile) as profiler:
+        for update in rag_pipeline.stream(state, stream_mode="updates"):
+            node_name = list(update.keys())[0]
+            logger.info(f"Node: {node_name}")
+            if profiler:
+                profiler.node_done(node_name)
+
+            if node_name == "search_arxiv":
+                logger.info(
+                    f"Articles found: {len(update[node_name].get('arxiv_results', []))}"
+                )
+            elif node_name == "download_pdfs":
+                # Paths when PDFs are kept on disk, contents in memory mode
+                node_update = update[node_name]
+                downloaded = node_update.get("pdf_paths") or node_update.get(
+                    "pdf_bytes", []
+                )
+                logger.info(f"PDFs downloaded: {len(downloaded)}")
+            elif node_name == "extract_text":
+                logger.info(
+                    f"Texts extracted: {len(update[node_name].get('markdowns', []))}"
+                )
+            elif node_name == "chunking":
+                logger.info(
+                    f"Chunks generated: {len(update[node_name].get('chunks', []))}"
+                )
+            elif node_name == "embedding":
+                logger.info(
+                    f"Embeddings generated: {len(update[node_name].get('embeddings', []))}"
+                )
 
 
 if __name__ == "__main__":
     import sys
 
-    if len(sys.argv) == 2 and sys.argv[1] == "viz":
+    # --profile enables profiling for this run
+    profile = "--profile" in sys.argv or None
+    args = [arg for arg in sys.argv[1:] if arg != "--profile"]
+
+    if len(args) == 1 and args[0] == "viz":
         logger.info(rag_pipeline.get_graph().draw_mermaid())
     else:
-        query = sys.argv[1]
-        stream_graph_updates(query)
+        query = args[0]
+        stream_graph_updates(query, profile=profile)
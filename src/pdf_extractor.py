@@ -1,15 +1,19 @@
+import pymupdf
 import pymupdf4llm
 
 
-def extract_text_from_pdf(pdf_path: str, pages: list[int] | None = None) -> str:
+def extract_text_from_pdf(pdf: str | bytes, pages: list[int] | None = None) -> str:
     """Extract text from a PDF file in Markdown format using pymupdf4llm.
 
     Args:
-        pdf_path (str): Path to the PDF file.
+        pdf (str | bytes): Path to the PDF file, or the PDF content in memory.
         pages (list[int] | None, optional): List of pages (0-based) to extract.
             If None, extracts all pages. Defaults to None.
 
     Returns:
         str: Extracted text in Markdown format.
     """
-    return pymupdf4llm.to_markdown(pdf_path, pages=pages)
+    if isinstance(pdf, bytes):
+        with pymupdf.open(stream=pdf, filetype="pdf") as doc:
+            return pymupdf4llm.to_markdown(doc, pages=pages)
+    return pymupdf4llm.to_markdown(pdf, pages=pages)
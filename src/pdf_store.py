@@ -0,0 +1,113 @@
+import gzip
+import os
+from typing import List, Optional
+
+
+class PdfStore:
+    """Size-capped directory of downloaded PDFs with least-recently-used eviction.
+
+    Files are named after the paper ID and optionally gzip-compressed. Reading a
+    file refreshes its modification time, which is used as the LRU order.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 0, compress: bool = False):
+        """
+        Args:
+            directory (str): Directory where PDFs are kept.
+            max_bytes (int, optional): Maximum total size of the stored files,
+                0 for no limit. Defaults to 0.
+            compress (bool, optional): Store PDFs gzip-compressed. Defaults to False.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress = compress
+
+    def path(self, paper_id: str) -> str:
+        """Path of the file for a paper ID."""
+        filename = f"{paper_id}.pdf.gz" if self.compress else f"{paper_id}.pdf"
+        return os.path.join(self.directory, filename)
+
+    def put(self, paper_id: str, data: bytes) -> str:
+        """Store a PDF, then evict old files if the store exceeds its size limit.
+
+        Args:
+            paper_id (str): Filesystem-safe paper ID.
+            data (bytes): PDF content.
+
+        Returns:
+            str: Path of the stored file.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(paper_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(gzip.compress(data) if self.compress else data)
+        os.replace(tmp_path, path)
+
+        self.evict(keep=path)
+        return path
+
+    def load(self, path: str) -> bytes:
+        """Read a stored PDF and mark it as recently used.
+
+        Args:
+            path (str): Path returned by put.
+
+        Returns:
+            bytes: PDF content, decompressed if needed.
+
+        Raises:
+            FileNotFoundError: If the file was evicted.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+        return gzip.decompress(data) if path.endswith(".gz") else data
+
+    def lookup(self, paper_id: str) -> Optional[str]:
+        """Path of the stored PDF of a paper ID, marked as recently used, or None
+        if it is not stored."""
+        path = self.path(paper_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def _files(self) -> List[os.DirEntry]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith((".pdf", ".pdf.gz"))
+        ]
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used files until the store fits its size limit.
+
+        Args:
+            keep (Optional[str], optional): Path that must not be evicted.
+
+        Returns:
+            int: Number of deleted files.
+        """
+        if not self.max_bytes:
+            return 0
+
+        entries = sorted(self._files(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        deleted = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if keep and os.path.abspath(entry.path) == os.path.abspath(keep):
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            deleted += 1
+        return deleted
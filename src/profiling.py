@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "profiles")
+
+# Sampling and tracemalloc are process-wide, so only one run is profiled at a time
+_active_lock = threading.Lock()
+
+
+def profiling_enabled(flag: Optional[bool] = None) -> bool:
+    """Whether a run should be profiled.
+
+    Args:
+        flag (Optional[bool], optional): Explicit request, e.g. from a header or CLI
+            flag. If None, the RAG_PROFILE environment variable decides.
+
+    Returns:
+        bool: True if profiling is on.
+    """
+    if flag is not None:
+        return flag
+    return os.getenv("RAG_PROFILE", "false").lower() == "true"
+
+
+class RunProfiler:
+    """Sampling profiler and per-node memory tracker for one graph run.
+
+    A background thread samples the stack of the thread running the graph at a
+    fixed interval. The samples are written in the collapsed stack format read by
+    flamegraph.pl and speedscope. Peak traced memory and wall time are recorded
+    for each node as the graph reports it finished.
+    """
+
+    def __init__(self, name: str, output_dir: str, interval: float = 0.005):
+        """
+        Args:
+            name (str): Name of the run, used as file name prefix.
+            output_dir (str): Directory where the profile files are written.
+            interval (float, optional): Sampling interval in seconds. Defaults to 0.005.
+        """
+        self.name = name
+        self.output_dir = output_dir
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.nodes: List[Dict[str, Any]] = []
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._owns_tracemalloc = False
+        self._sampler = threading.Thread(
+            target=self._sample, name=f"profiler-{name}", daemon=True
+        )
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._start_time = self._last_mark = time.perf_counter()
+        self._sampler.start()
+
+    def node_done(self, node_name: str):
+        """Record wall time and peak memory since the previous node finished."""
+        now = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self.nodes.append(
+            {
+                "node": node_name,
+                "seconds": round(now - self._last_mark, 6),
+                "peak_memory_mb": round(peak / (1024 * 1024), 3),
+            }
+        )
+        self._last_mark = now
+
+    def stop(self) -> Dict[str, str]:
+        """Stop sampling and write the profile files.
+
+        Returns:
+            Dict[str, str]: Paths of the collapsed stacks and summary files.
+        """
+        self._stop.set()
+        self._sampler.join()
+        total = time.perf_counter() - self._start_time
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        prefix = os.path.join(
+            self.output_dir, f"{self.name}-{stamp}-{uuid.uuid4().hex[:8]}"
+        )
+        paths = {"stacks": f"{prefix}.folded", "summary": f"{prefix}.json"}
+
+        with open(paths["stacks"], "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(paths["summary"], "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "name": self.name,
+                    "total_seconds": round(total, 6),
+                    "samples": sum(self.samples.values()),
+                    "interval_seconds": self.interval,
+                    "nodes": self.nodes,
+                },
+                f,
+                indent=2,
+            )
+        return paths
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                    f"{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+@contextmanager
+def profile_run(
+    name: str, enabled: Optional[bool] = None
+) -> Iterator[Optional[RunProfiler]]:
+    """Profile the enclosed graph run if profiling is enabled.
+
+    Args:
+        name (str): Name of the run, used as file name prefix.
+        enabled (Optional[bool], optional): Explicit request; if None, the
+            RAG_PROFILE environment variable decides.
+
+    Yields:
+        Optional[RunProfiler]: The profiler, or None when profiling is off or
+            another run is already being profiled, so that callers only pay for
+            a None check.
+
+    Note:
+        Files are written to RAG_PROFILE_DIR (default: ./profiles). Only the
+        calling thread is sampled, which is where LangGraph runs the nodes of a
+        linear graph. Memory peaks are process-wide, so concurrent runs are not
+        profiled to keep them from showing up in each other's numbers.
+    """
+    if not profiling_enabled(enabled):
+        yield None
+        return
+    if not _active_lock.acquire(blocking=False):
+        logger.warning(f"Not profiling {name}: another run is being profiled")
+        yield None
+        return
+
+    try:
+        profiler = RunProfiler(
+            name,
+            os.getenv("RAG_PROFILE_DIR", PROFILE_DIR),
+            interval=float(os.getenv("RAG_PROFILE_INTERVAL", "0.005")),
+        )
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            paths = profiler.stop()
+            logger.info(f"Profile written to {paths['stacks']} and {paths['summary']}")
+    finally:
+        _active_lock.release()
@@ -1,7 +1,7 @@
 from langgraph.graph import StateGraph, START, END
 from typing_extensions import TypedDict
 from typing import List, Dict, Any, Optional
-from src import embedder
+from src import embedder, profiling
 from src.vectorstore import QdrantVectorStore
 import os
 import logging
@@ -60,7 +60,7 @@ def generate_query_embedding_node(state: State) -> State:
     """Generates embedding vector for the user's query.
 
     This node takes the user's query and converts it into an embedding vector
-    using OpenAI's embedding model.
+    using the configured embedding provider.
 
     Args:
         state: Current state of the pipeline containing the user's query.
@@ -71,7 +71,7 @@ def generate_query_embedding_node(state: State) -> State:
     """
     try:
         # Generate query embedding
-        query_embedding = embedder.get_openai_embeddings([state["query"]])[0]
+        query_embedding = embedder.get_embedding_provider().embed_query(state["query"])
         logger.info("Successfully generated query embedding")
         return {
             "query_embedding": query_embedding,
@@ -175,7 +175,7 @@ graph.add_edge("generate_response", END)
 rag_qa_pipeline = graph.compile()
 
 
-def stream_qa_updates(query: str):
+def stream_qa_updates(query: str, profile: Optional[bool] = None):
     """Streams the execution of the RAG pipeline and logs its progress.
 
     This function executes the RAG pipeline step by step and logs the progress
@@ -183,6 +183,8 @@ def stream_qa_updates(query: str):
 
     Args:
         query: The user's question to be answered.
+        profile: Whether to profile the run. Defaults to the RAG_PROFILE
+            environment variable.
 
     Returns:
         None. The function logs the progress and results of the pipeline execution.
@@ -190,27 +192,30 @@ def stream_qa_updates(query: str):
     state = {"query": query}
     logger.info(f"Starting Q&A pipeline with query: {query}")
 
-    for update in rag_qa_pipeline.stream(state, stream_mode="updates"):
-        node_name = list(update.keys())[0]
-        node_state = update[node_name]
-
-        logger.info(f"Processing node: {node_name}")
-        logger.info(f"Status: {node_state.get('status', 'N/A')}")
-
-        if node_state.get("error"):
-            logger.error(f"Error in {node_name}: {node_state['error']}")
-            return
-
-        if node_name == "retrieve_chunks":
-            chunks = node_state.get("retrieved_chunks", [])
-            logger.info(f"Retrieved {len(chunks)} chunks")
-            if chunks:
-                logger.info("Found articles:")
-                for chunk in chunks:
-                    logger.info(f"- {chunk['arxiv_id']}")
-        elif node_name == "generate_response":
-            logger.info("Generated response:")
-            logger.info(node_state.get("response", ""))
+    with profiling.profile_run("qa", profile) as profiler:
+        for update in rag_qa_pipeline.stream(state, stream_mode="updates"):
+            node_name = list(update.keys())[0]
+            node_state = update[node_name]
+            if profiler:
+                profiler.node_done(node_name)
+
+            logger.info(f"Processing node: {node_name}")
+            logger.info(f"Status: {node_state.get('status', 'N/A')}")
+
+            if node_state.get("error"):
+                logger.error(f"Error in {node_name}: {node_state['error']}")
+                return
+
+            if node_name == "retrieve_chunks":
+                chunks = node_state.get("retrieved_chunks", [])
+                logger.info(f"Retrieved {len(chunks)} chunks")
+                if chunks:
+                    logger.info("Found articles:")
+                    for chunk in chunks:
+                        logger.info(f"- {chunk['arxiv_id']}")
+            elif node_name == "generate_response":
+                logger.info("Generated response:")
+                logger.info(node_state.get("response", ""))
 
     return node_state.get("response", "")
 
@@ -218,15 +223,19 @@ def stream_qa_updates(query: str):
 if __name__ == "__main__":
     import sys
 
-    if len(sys.argv) == 2 and sys.argv[1] == "viz":
+    # --profile enables profiling for this run
+    profile = "--profile" in sys.argv or None
+    args = [arg for arg in sys.argv[1:] if arg != "--profile"]
+
+    if len(args) == 1 and args[0] == "viz":
         logger.info(rag_qa_pipeline.get_graph().draw_mermaid())
         logger.info(
             "\nCopy the Mermaid code above and paste it at https://mermaid.live to visualize the graph!"
         )
-    elif len(sys.argv) < 2:
+    elif len(args) < 1:
         logger.error(
-            "Usage: python -m src.rag_qa_graph <query>  or  python -m src.rag_qa_graph viz"
+            "Usage: python -m src.rag_qa_graph <query> [--profile]  or  python -m src.rag_qa_graph viz"
         )
     else:
-        query = sys.argv[1]
-        stream_qa_updates(query)
+        query = args[0]
+        stream_qa_updates(query, profile=profile)
@@ -1,20 +1,40 @@
 from qdrant_client import QdrantClient, models
-from typing import List, Dict, Any
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional
+import json
+import threading
 import time
 import uuid
 import os
 from dotenv import load_dotenv
 
+from src.embedder import truncate_embedding
+
 load_dotenv()
 
 
+# Named vectors used when QDRANT_PREFETCH_DIM is set
+PREFETCH_VECTOR = "prefetch"
+FULL_VECTOR = "full"
+
+# Nested indexing pauses per collection, shared by concurrent bulk loads
+_indexing_pause_lock = threading.Lock()
+_indexing_pauses: Dict[str, int] = {}
+_saved_indexing_thresholds: Dict[str, int] = {}
+
+
 class QdrantVectorStore:
-    def __init__(self):
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None):
         self.client = QdrantClient(
-            url=os.getenv("QDRANT_URL", "http://localhost:6333"),
-            api_key=os.getenv("QDRANT_API_KEY"),
+            url=url or os.getenv("QDRANT_URL", "http://localhost:6333"),
+            api_key=api_key or os.getenv("QDRANT_API_KEY"),
             timeout=60,
         )
+        # Dimension of the truncated (Matryoshka) prefetch vector, None to store
+        # a single unnamed vector per point
+        self.prefetch_dim = int(os.getenv("QDRANT_PREFETCH_DIM", "0")) or None
+        # Collections whose vector layout matched the configuration
+        self._checked_collections = set()
 
     def upsert_embeddings_qdrant(
         self,
@@ -24,6 +44,7 @@ class QdrantVectorStore:
         vector_size: int = 1536,  # text-embedding-3-small
         distance=models.Distance.COSINE,
         batch_size: int = 100,
+        ids: Optional[List[str]] = None,
     ):
         """Insert embeddings and metadata into a Qdrant collection in batches.
 
@@ -36,6 +57,8 @@ class QdrantVectorStore:
             vector_size (int, optional): Dimension of the embeddings. Defaults to 1536.
             distance (models.Distance, optional): Distance metric. Defaults to COSINE.
             batch_size (int, optional): Size of each batch for insertion. Defaults to 100.
+            ids (Optional[List[str]], optional): Point IDs, one per embedding. Defaults to
+                random UUIDs; pass stable IDs to make re-insertion overwrite points.
             timeout (int, optional): Timeout in seconds for each operation. Defaults to 60.
 
         Note:
@@ -45,32 +68,27 @@ class QdrantVectorStore:
         """
 
         # Create collection if it doesn't exist
-        collections = self.client.get_collections().collections
-        collection_names = [collection.name for collection in collections]
-
-        if collection_name not in collection_names:
-            self.client.create_collection(
-                collection_name=collection_name,
-                vectors_config=models.VectorParams(
-                    size=vector_size,
-                    distance=distance,
-                ),
-            )
+        self._ensure_collection(collection_name, vector_size, distance)
 
         # Insert in batches
-        total = len(embeddings)
+        vectors = self._point_vectors(embeddings)
+        # Generate unique IDs using UUID for each point
+        ids = ids or [str(uuid.uuid4()) for _ in vectors]
+        total = len(vectors)
         for i in range(0, total, batch_size):
-            batch_embeddings = embeddings[i : i + batch_size]
+            batch_vectors = vectors[i : i + batch_size]
             batch_metadatas = metadata[i : i + batch_size]
+            batch_ids = ids[i : i + batch_size]
 
-            # Generate unique IDs using UUID for each point
             points = [
                 models.PointStruct(
-                    id=str(uuid.uuid4()),  # Generate a unique UUID for each point
+                    id=point_id,
                     vector=vec,
                     payload=meta,
                 )
-                for vec, meta in zip(batch_embeddings, batch_metadatas)
+                for point_id, vec, meta in zip(
+                    batch_ids, batch_vectors, batch_metadatas
+                )
             ]
 
             # Try to insert batch with retry
@@ -91,11 +109,258 @@ class QdrantVectorStore:
                     )
                     time.sleep(2)  # Wait 2 seconds before trying again
 
+    def bulk_upload_qdrant(
+        self,
+        embeddings: List[list],
+        metadata: List[Dict[str, Any]],
+        collection_name: str = "arxiv_chunks",
+        vector_size: int = 1536,  # text-embedding-3-small
+        distance=models.Distance.COSINE,
+        shard_number: int = 1,
+        replication_factor: int = 1,
+        write_consistency_factor: int = 1,
+        parallel: int = 4,
+        target_batch_bytes: int = 8 * 1024 * 1024,
+        max_batch_size: int = 256,
+    ):
+        """Bulk-load embeddings and metadata into a Qdrant collection.
+
+        Intended for large backfills. Points are uploaded by several worker
+        processes, and HNSW indexing is switched off for the duration of the
+        load and restored afterwards, so the index is built once at the end
+        instead of being updated after every batch.
+
+        Args:
+            embeddings (List[list]): List of embedding vectors.
+            metadata (List[Dict[str, Any]]): List of metadata dictionaries (payloads).
+            collection_name (str, optional): Name of the Qdrant collection. Defaults to "arxiv_chunks".
+            vector_size (int, optional): Dimension of the embeddings. Defaults to 1536.
+            distance (models.Distance, optional): Distance metric. Defaults to COSINE.
+            shard_number (int, optional): Number of shards for a new collection. Defaults to 1.
+            replication_factor (int, optional): Replicas per shard for a new collection. Defaults to 1.
+            write_consistency_factor (int, optional): Replicas that must confirm a write. Defaults to 1.
+            parallel (int, optional): Number of parallel upload workers. Defaults to 4.
+            target_batch_bytes (int, optional): Approximate size of each request in bytes.
+                Defaults to 8 MiB.
+            max_batch_size (int, optional): Upper bound on points per request. Defaults to 256.
+
+        Note:
+            Sharding and replication settings only apply when the collection is created.
+            The batch size is derived from the average serialized point size, so
+            collections with long chunks or prefetch vectors are sent in smaller
+            requests, well under Qdrant's default 32 MiB request limit.
+        """
+        if not embeddings:
+            return
+
+        self._ensure_collection(
+            collection_name,
+            vector_size=vector_size,
+            distance=distance,
+            shard_number=shard_number,
+            replication_factor=replication_factor,
+            write_consistency_factor=write_consistency_factor,
+        )
+
+        vectors = self._point_vectors(embeddings)
+        batch_size = self._adaptive_batch_size(
+            vectors, metadata, target_batch_bytes, max_batch_size
+        )
+        print(
+            f"Uploading {len(embeddings)} points with {parallel} workers "
+            f"(batch size {batch_size})..."
+        )
+
+        with self.indexing_paused(collection_name):
+            self.client.upload_collection(
+                collection_name=collection_name,
+                vectors=vectors,
+                payload=metadata,
+                ids=[str(uuid.uuid4()) for _ in embeddings],
+                batch_size=batch_size,
+                parallel=parallel,
+                max_retries=3,
+                wait=True,
+            )
+        print("Bulk upload finished, index rebuild scheduled.")
+
+    @contextmanager
+    def indexing_paused(self, collection_name: str):
+        """Disable HNSW indexing of a collection for the duration of a bulk load.
+
+        Args:
+            collection_name (str): Name of the collection.
+
+        Note:
+            Pauses are counted per collection, so concurrent bulk loads into the
+            same collection only re-enable indexing when the last one finishes.
+            The previous indexing threshold is then restored, or
+            QDRANT_INDEXING_THRESHOLD (default: 20000) if it was unset or 0, which
+            makes Qdrant build the index for the loaded points.
+        """
+        with _indexing_pause_lock:
+            if not _indexing_pauses.get(collection_name):
+                indexing_threshold = self.client.get_collection(
+                    collection_name
+                ).config.optimizer_config.indexing_threshold
+                # 0 means a previous load was interrupted before restoring it
+                _saved_indexing_thresholds[collection_name] = indexing_threshold or int(
+                    os.getenv("QDRANT_INDEXING_THRESHOLD", "20000")
+                )
+                self.client.update_collection(
+                    collection_name=collection_name,
+                    optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+                )
+            _indexing_pauses[collection_name] = (
+                _indexing_pauses.get(collection_name, 0) + 1
+            )
+        try:
+            yield
+        finally:
+            with _indexing_pause_lock:
+                _indexing_pauses[collection_name] -= 1
+                if not _indexing_pauses[collection_name]:
+                    del _indexing_pauses[collection_name]
+                    # Re-enable indexing, which triggers the index rebuild
+                    self.client.update_collection(
+                        collection_name=collection_name,
+                        optimizers_config=models.OptimizersConfigDiff(
+                            indexing_threshold=_saved_indexing_thresholds.pop(
+                                collection_name
+                            )
+                        ),
+                    )
+
+    def _ensure_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        distance=models.Distance.COSINE,
+        shard_number: Optional[int] = None,
+        replication_factor: Optional[int] = None,
+        write_consistency_factor: Optional[int] = None,
+    ):
+        """Create a collection if it doesn't exist yet.
+
+        With a prefetch dimension configured, the collection gets two named
+        vectors: a small indexed one for candidate search and the full one,
+        kept on disk without an HNSW graph, for rescoring.
+
+        Raises:
+            ValueError: If the prefetch dimension is not smaller than vector_size,
+                or an existing collection has a different vector layout.
+        """
+        self._expected_layout(vector_size)
+        collections = self.client.get_collections().collections
+        collection_names = [collection.name for collection in collections]
+
+        if collection_name not in collection_names:
+            if self.prefetch_dim:
+                vectors_config = {
+                    PREFETCH_VECTOR: models.VectorParams(
+                        size=self.prefetch_dim,
+                        distance=distance,
+                    ),
+                    FULL_VECTOR: models.VectorParams(
+                        size=vector_size,
+                        distance=distance,
+                        on_disk=True,
+                        hnsw_config=models.HnswConfigDiff(m=0),
+                    ),
+                }
+            else:
+                vectors_config = models.VectorParams(
+                    size=vector_size,
+                    distance=distance,
+                )
+            self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=vectors_config,
+                shard_number=shard_number,
+                replication_factor=replication_factor,
+                write_consistency_factor=write_consistency_factor,
+            )
+        else:
+            self._check_collection_layout(collection_name, vector_size)
+
+    def _expected_layout(self, vector_size: int) -> Any:
+        """Vector sizes of a collection for the configuration: a dict of named
+        vector sizes with a prefetch dimension, else the single vector size."""
+        if not self.prefetch_dim:
+            return vector_size
+        if self.prefetch_dim >= vector_size:
+            raise ValueError(
+                f"QDRANT_PREFETCH_DIM ({self.prefetch_dim}) must be smaller than "
+                f"the embedding size ({vector_size})"
+            )
+        return {PREFETCH_VECTOR: self.prefetch_dim, FULL_VECTOR: vector_size}
+
+    def _check_collection_layout(self, collection_name: str, vector_size: int):
+        """Check once per collection that it matches the configured vectors."""
+        if collection_name in self._checked_collections:
+            return
+        expected = self._expected_layout(vector_size)
+        vectors = self.client.get_collection(collection_name).config.params.vectors
+
+        if isinstance(vectors, dict):
+            actual = {name: params.size for name, params in vectors.items()}
+        else:
+            actual = vectors.size
+
+        if actual != expected:
+            raise ValueError(
+                f"Collection {collection_name} has vectors {actual}, but the "
+                f"configuration expects {expected}. Use a new collection when "
+                f"changing QDRANT_PREFETCH_DIM or the embedding model."
+            )
+        self._checked_collections.add(collection_name)
+
+    def _point_vectors(self, embeddings: List[list]) -> List[Any]:
+        """Build the vectors stored for each point from the full embeddings."""
+        if not self.prefetch_dim:
+            return embeddings
+        return [
+            {
+                PREFETCH_VECTOR: truncate_embedding(vec, self.prefetch_dim),
+                FULL_VECTOR: vec,
+            }
+            for vec in embeddings
+        ]
+
+    @staticmethod
+    def _adaptive_batch_size(
+        vectors: List[Any],
+        metadata: List[Dict[str, Any]],
+        target_batch_bytes: int,
+        max_batch_size: int,
+        sample_size: int = 100,
+    ) -> int:
+        """Estimate how many points fit in a request of about target_batch_bytes.
+
+        The point size is averaged over a sample of the input, serialized as
+        JSON like the REST client sends it: a float takes about 20 bytes as
+        text, five times its float32 size.
+        """
+        sample = min(len(vectors), sample_size)
+        point_bytes = sum(
+            len(
+                json.dumps(
+                    {"id": str(uuid.uuid4()), "vector": vector, "payload": meta},
+                    default=str,
+                )
+            )
+            for vector, meta in zip(vectors[:sample], metadata[:sample])
+        ) / max(sample, 1)
+        return max(
+            1, min(max_batch_size, int(target_batch_bytes // max(point_bytes, 1)))
+        )
+
     def search_similar_chunks(
         self,
         query_embedding: List[float],
         collection_name: str = "arxiv_chunks",
         limit: int = 10,
+        prefetch_limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """Search for chunks similar to the query embedding in Qdrant.
 
@@ -103,23 +368,50 @@ class QdrantVectorStore:
             query_embedding (List[float]): Query embedding vector.
             collection_name (str, optional): Name of the Qdrant collection. Defaults to "arxiv_chunks".
             limit (int, optional): Maximum number of results to return. Defaults to 10.
+            prefetch_limit (Optional[int], optional): Number of candidates fetched with the
+                truncated vector before rescoring. Defaults to 5 * limit.
 
         Returns:
             List[Dict[str, Any]]: List of chunks with their metadata and similarity scores.
                 Each chunk contains:
                 - text: The chunk's text content
                 - arxiv_id: The arXiv ID of the source document
+                - title: The title of the source document
                 - chunk_idx: The index of the chunk in the document
                 - score: The similarity score
+
+        Raises:
+            ValueError: If the collection's vectors don't match the configuration.
+
+        Note:
+            With a prefetch dimension configured, candidates are found with the
+            truncated vector and then ranked with the full vector.
         """
+        # Report a configuration mismatch instead of returning no results
+        if self.client.collection_exists(collection_name):
+            self._check_collection_layout(collection_name, len(query_embedding))
 
         try:
-            # Perform search with score filter
-            search_result = self.client.search(
-                collection_name=collection_name,
-                query_vector=query_embedding,
-                limit=limit,
-            )
+            if self.prefetch_dim:
+                # Prefetch candidates with the truncated vector, rescore with the full one
+                search_result = self.client.query_points(
+                    collection_name=collection_name,
+                    prefetch=models.Prefetch(
+                        query=truncate_embedding(query_embedding, self.prefetch_dim),
+                        using=PREFETCH_VECTOR,
+                        limit=prefetch_limit or limit * 5,
+                    ),
+                    query=query_embedding,
+                    using=FULL_VECTOR,
+                    limit=limit,
+                ).points
+            else:
+                # Perform search with score filter
+                search_result = self.client.search(
+                    collection_name=collection_name,
+                    query_vector=query_embedding,
+                    limit=limit,
+                )
 
             # Format results
             results = []
@@ -128,6 +420,7 @@ class QdrantVectorStore:
                     {
                         "text": hit.payload.get("text", ""),
                         "arxiv_id": hit.payload.get("arxiv_id", ""),
+                        "title": hit.payload.get("title", ""),
                         "chunk_idx": hit.payload.get("chunk_idx", 0),
                         "score": hit.score,
                     }
@@ -157,14 +450,17 @@ class QdrantVectorStore:
         try:
             collection_info = self.client.get_collection(collection_name)
             collection_stats = self.client.get_collection(collection_name).points_count
+            vectors = collection_info.config.params.vectors
+            if isinstance(vectors, dict):
+                vectors = vectors[FULL_VECTOR]
 
             return {
                 "name": collection_name,
                 "vectors_count": collection_stats,
                 "status": collection_info.status,
                 "config": {
-                    "vector_size": collection_info.config.params.vectors.size,
-                    "distance": collection_info.config.params.vectors.distance,
+                    "vector_size": vectors.size,
+                    "distance": vectors.distance,
                 },
             }
         except Exception as e:
@@ -0,0 +1,150 @@
+import pytest
+
+from src import embedder
+from src.embedder import LocalEmbeddingProvider
+
+
+def make_local_provider(
+    batch_size: int, max_batch_chars: int
+) -> LocalEmbeddingProvider:
+    # Skip __init__, which loads a model from disk
+    provider = LocalEmbeddingProvider.__new__(LocalEmbeddingProvider)
+    provider.batch_size = batch_size
+    provider.max_batch_chars = max_batch_chars
+    return provider
+
+
+def test_dynamic_batches_cover_every_text_once_shortest_first():
+    texts = ["x" * n for n in [50, 3, 20, 1, 8, 35, 2]]
+    provider = make_local_provider(batch_size=3, max_batch_chars=1000)
+
+    batches = list(provider._dynamic_batches(texts))
+
+    flat = [i for batch in batches for i in batch]
+    assert sorted(flat) == list(range(len(texts)))
+    assert [len(texts[i]) for i in flat] == sorted(len(t) for t in texts)
+
+
+def test_dynamic_batches_respect_batch_size_and_char_budget():
+    texts = ["x" * n for n in [10, 10, 10, 10, 40, 40, 40, 200]]
+    provider = make_local_provider(batch_size=3, max_batch_chars=100)
+
+    batches = list(provider._dynamic_batches(texts))
+
+    assert [len(b) for b in batches] == [3, 2, 2, 1]
+    for batch in batches:
+        assert len(batch) <= 3
+        if len(batch) > 1:
+            assert len(batch) * max(len(texts[i]) for i in batch) <= 100
+
+
+TEXTS = [
+    "a much longer sentence about retrieval augmented generation",
+    "short",
+    "transformers use attention",
+    "a",
+    "embedding models map text to vectors of floats",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model_path(tmp_path_factory):
+    """A randomly initialized two-layer BERT saved as a sentence-transformers model."""
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    from sentence_transformers.models import Pooling, Transformer
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    path = tmp_path_factory.mktemp("tiny-model")
+    hf_path = path / "hf"
+    hf_path.mkdir()
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab += sorted({word for text in TEXTS for word in text.split()})
+    (hf_path / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+    BertTokenizerFast(vocab_file=str(hf_path / "vocab.txt")).save_pretrained(hf_path)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=16,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=64,
+    )
+    BertModel(config).save_pretrained(hf_path)
+
+    model = sentence_transformers.SentenceTransformer(
+        modules=[
+            Transformer(str(hf_path), max_seq_length=32),
+            Pooling(16, pooling_mode="mean"),
+        ],
+        device="cpu",
+    )
+    model.save(str(path / "model"))
+    return str(path / "model")
+
+
+def assert_same_vectors(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a == pytest.approx(e, abs=1e-4)
+
+
+def test_local_provider_loads_model_and_detects_vector_size(tiny_model_path):
+    provider = LocalEmbeddingProvider(tiny_model_path)
+
+    assert provider.vector_size == 16
+
+
+def test_local_provider_returns_vectors_in_input_order(tiny_model_path):
+    provider = LocalEmbeddingProvider(tiny_model_path, batch_size=2, max_batch_chars=60)
+
+    vectors = provider.embed_documents(TEXTS)
+
+    # Each text on its own, so no batching or reordering is involved
+    expected = [provider.embed_query(text) for text in TEXTS]
+    assert_same_vectors(vectors, expected)
+    assert len(set(map(tuple, vectors))) == len(TEXTS)
+
+
+def test_local_provider_onnx_backend(tiny_model_path):
+    pytest.importorskip("optimum.onnxruntime")
+    torch_provider = LocalEmbeddingProvider(tiny_model_path)
+    onnx_provider = LocalEmbeddingProvider(tiny_model_path, backend="onnx")
+
+    assert onnx_provider.vector_size == 16
+    assert_same_vectors(
+        onnx_provider.embed_documents(TEXTS), torch_provider.embed_documents(TEXTS)
+    )
+
+
+def test_local_provider_multi_process(tiny_model_path):
+    single = LocalEmbeddingProvider(tiny_model_path)
+    pooled = LocalEmbeddingProvider(tiny_model_path, batch_size=2, num_workers=2)
+
+    # The pool is stopped at exit by the provider
+    assert_same_vectors(pooled.embed_documents(TEXTS), single.embed_documents(TEXTS))
+
+
+@pytest.fixture
+def clear_provider_cache():
+    embedder.get_embedding_provider.cache_clear()
+    yield
+    embedder.get_embedding_provider.cache_clear()
+
+
+def test_get_embedding_provider_rejects_unknown_provider(
+    monkeypatch, clear_provider_cache
+):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "nope")
+
+    with pytest.raises(ValueError, match="Unknown EMBEDDING_PROVIDER"):
+        embedder.get_embedding_provider()
+
+
+def test_get_embedding_provider_requires_local_model_path(
+    monkeypatch, clear_provider_cache
+):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    monkeypatch.delenv("LOCAL_EMBEDDING_MODEL_PATH", raising=False)
+
+    with pytest.raises(ValueError, match="LOCAL_EMBEDDING_MODEL_PATH"):
+        embedder.get_embedding_provider()
@@ -0,0 +1,202 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+import pymupdf
+import pytest
+from qdrant_client import QdrantClient
+
+from src import arxiv_downloader, chunker, embedder, harvest
+from src.embedder import EmbeddingProvider
+from src.vectorstore import QdrantVectorStore
+
+PAPER_IDS = ["2401.00001v1", "2401.00002v1", "2401.00003v1"]
+COLLECTION = "harvest_test"
+
+
+def make_pdf(text: str) -> bytes:
+    doc = pymupdf.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def atom_feed(ids: List[str], total: int) -> str:
+    entries = "".join(f"""
+  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}</id>
+    <updated>2024-01-01T00:00:00Z</updated>
+    <published>2024-01-01T00:00:00Z</published>
+    <title>Paper {arxiv_id}</title>
+    <summary>Abstract of {arxiv_id}</summary>
+    <author><name>Ada Lovelace</name></author>
+    <link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related"
+      type="application/pdf"/>
+    <arxiv:primary_category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>""" for arxiv_id in ids)
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"
+      xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"
+      xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title>arXiv Query</title>
+  <opensearch:totalResults>{total}</opensearch:totalResults>
+  <opensearch:startIndex>0</opensearch:startIndex>
+  <opensearch:itemsPerPage>{len(ids)}</opensearch:itemsPerPage>{entries}
+</feed>"""
+
+
+class ArxivStandIn(BaseHTTPRequestHandler):
+    """Serves the query API and PDF downloads of a local stand-in for arXiv."""
+
+    pdf_requests: List[str] = []
+    query_requests: List[str] = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.startswith("/pdf/"):
+            arxiv_id = url.path.removeprefix("/pdf/")
+            self.pdf_requests.append(arxiv_id)
+            self._send(make_pdf(f"Full text of paper {arxiv_id}."), "application/pdf")
+        else:
+            self.query_requests.append(self.path)
+            params = parse_qs(url.query)
+            # Any requested ID exists; without IDs, the query matches PAPER_IDS
+            ids = [i for i in params.get("id_list", [""])[0].split(",") if i]
+            matching = ids or PAPER_IDS
+            start = int(params.get("start", ["0"])[0])
+            end = start + int(params.get("max_results", ["100"])[0])
+            self._send(
+                atom_feed(matching[start:end], len(matching)).encode(),
+                "application/atom+xml",
+            )
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    vector_size = 8
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[float(len(text) % 7 + 1)] * self.vector_size for text in texts]
+
+
+@pytest.fixture
+def arxiv_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArxivStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    monkeypatch.setenv("ARXIV_API_URL", f"http://{host}:{port}/api/query")
+    monkeypatch.setenv("ARXIV_DOWNLOAD_DOMAIN", f"{host}:{port}")
+    monkeypatch.setenv("ARXIV_DELAY_SECONDS", "0")
+    ArxivStandIn.pdf_requests = []
+    ArxivStandIn.query_requests = []
+    yield ArxivStandIn
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def harvest_env(tmp_path, monkeypatch, arxiv_server):
+    monkeypatch.setattr(arxiv_downloader, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("ARXIV_CACHE_PATH", str(tmp_path / "arxiv_cache.sqlite"))
+    monkeypatch.setenv("PDF_STORAGE", "disk")
+    monkeypatch.delenv("QDRANT_PREFETCH_DIM", raising=False)
+    monkeypatch.setattr(
+        embedder, "get_embedding_provider", lambda: FakeEmbeddingProvider()
+    )
+    cached = [
+        arxiv_downloader.get_client,
+        arxiv_downloader.get_cache,
+        arxiv_downloader.get_pdf_store,
+    ]
+    for function in cached:
+        function.cache_clear()
+
+    store = QdrantVectorStore()
+    store.client = QdrantClient(":memory:")
+    checkpoint = harvest.HarvestCheckpoint(str(tmp_path / "harvest.sqlite"))
+    yield checkpoint, store
+
+    checkpoint.conn.close()
+    for function in cached:
+        function.cache_clear()
+
+
+def test_harvest_resumes_after_failure_without_duplicates(harvest_env, monkeypatch):
+    checkpoint, store = harvest_env
+    chunk_markdown_text = chunker.chunk_markdown_text
+
+    def fail_on_second_paper(markdown_text, *args, **kwargs):
+        if "2401.00002v1" in markdown_text:
+            raise RuntimeError("simulated crash")
+        return chunk_markdown_text(markdown_text, *args, **kwargs)
+
+    monkeypatch.setattr(chunker, "chunk_markdown_text", fail_on_second_paper)
+    harvest.list_papers(checkpoint, ids=PAPER_IDS)
+    harvest.run_harvest(checkpoint, store, COLLECTION)
+
+    counts = checkpoint.counts()
+    assert counts[harvest.INDEXED] == 2
+    assert counts[harvest.EXTRACTED] == 1
+    assert counts["errors"] == 1
+
+    monkeypatch.setattr(chunker, "chunk_markdown_text", chunk_markdown_text)
+    harvest.list_papers(checkpoint)
+    harvest.run_harvest(checkpoint, store, COLLECTION)
+
+    counts = checkpoint.counts()
+    assert counts[harvest.INDEXED] == len(PAPER_IDS)
+    assert counts["errors"] == 0
+    # Each PDF was downloaded once; the failed paper resumed from its text
+    assert sorted(ArxivStandIn.pdf_requests) == PAPER_IDS
+    # One short chunk per paper, and re-running did not add points
+    assert store.client.count(COLLECTION, exact=True).count == len(PAPER_IDS)
+
+    harvest.run_harvest(checkpoint, store, COLLECTION)
+    assert store.client.count(COLLECTION, exact=True).count == len(PAPER_IDS)
+
+
+def test_resume_rejects_a_different_selection(harvest_env):
+    checkpoint, _ = harvest_env
+    harvest.list_papers(checkpoint, ids=PAPER_IDS[:2])
+
+    with pytest.raises(ValueError, match="different selection"):
+        harvest.list_papers(checkpoint, ids=PAPER_IDS)
+
+    # Same selection in another order, or no selection, resumes
+    harvest.list_papers(checkpoint, ids=list(reversed(PAPER_IDS[:2])))
+    harvest.list_papers(checkpoint)
+    assert checkpoint.counts()[harvest.PENDING] == 2
+
+
+def test_listing_splits_long_id_lists(harvest_env):
+    checkpoint, _ = harvest_env
+    ids = [f"2402.{n:05d}v1" for n in range(1, 451)]
+
+    harvest.list_papers(checkpoint, ids=ids)
+
+    assert checkpoint.counts()[harvest.PENDING] == len(ids)
+    assert {row["arxiv_id"] for row in checkpoint.unfinished()} == set(ids)
+    # Three chunks of at most 200 IDs, each read in pages of 100 results
+    assert len(ArxivStandIn.query_requests) == 5
+    assert max(len(path) for path in ArxivStandIn.query_requests) < 4000
+
+
+def test_listing_stops_at_max_results_across_chunks(harvest_env):
+    checkpoint, _ = harvest_env
+    ids = [f"2402.{n:05d}v1" for n in range(1, 451)]
+
+    harvest.list_papers(checkpoint, ids=ids, max_results=250)
+
+    assert checkpoint.counts()[harvest.PENDING] == 250
@@ -0,0 +1,59 @@
+import random
+import uuid
+
+import pytest
+from qdrant_client import QdrantClient, models
+
+from src.vectorstore import FULL_VECTOR, PREFETCH_VECTOR, QdrantVectorStore
+
+
+@pytest.mark.parametrize("prefetch_dim", [None, 256])
+def test_adaptive_batch_size_keeps_json_requests_near_target(prefetch_dim):
+    vectors = [[random.uniform(-1, 1) for _ in range(1536)] for _ in range(300)]
+    if prefetch_dim:
+        vectors = [
+            {PREFETCH_VECTOR: vector[:prefetch_dim], FULL_VECTOR: vector}
+            for vector in vectors
+        ]
+    metadata = [{"text": "x" * 1000, "chunk_idx": i} for i in range(300)]
+    target = 8 * 1024 * 1024
+
+    batch_size = QdrantVectorStore._adaptive_batch_size(
+        vectors, metadata, target, max_batch_size=1024
+    )
+
+    request = models.PointsList(
+        points=[
+            models.PointStruct(id=str(uuid.uuid4()), vector=vector, payload=meta)
+            for vector, meta in zip(vectors[:batch_size], metadata[:batch_size])
+        ]
+    )
+    assert 0.75 * target < len(request.model_dump_json()) <= 1.1 * target
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.delenv("QDRANT_PREFETCH_DIM", raising=False)
+    store = QdrantVectorStore()
+    store.client = QdrantClient(":memory:")
+    return store
+
+
+def test_search_rejects_collection_with_another_layout(store):
+    store.upsert_embeddings_qdrant(
+        [[1.0, 0.0, 0.0, 0.0]], [{"text": "a"}], collection_name="c", vector_size=4
+    )
+    assert store.search_similar_chunks([1.0, 0.0, 0.0, 0.0], "c")[0]["text"] == "a"
+
+    store.prefetch_dim = 2
+    store._checked_collections.clear()
+    with pytest.raises(ValueError, match="Collection c has vectors 4"):
+        store.search_similar_chunks([1.0, 0.0, 0.0, 0.0], "c")
+
+
+def test_prefetch_dim_must_be_smaller_than_vector_size(store):
+    store.prefetch_dim = 4
+    with pytest.raises(ValueError, match="must be smaller"):
+        store.upsert_embeddings_qdrant(
+            [[1.0, 0.0, 0.0, 0.0]], [{"text": "a"}], collection_name="c", vector_size=4
+        )